@@ -6,9 +6,11 @@ Also demonstrates identifying USB devices.
 
 import sys
 import serial
-import time
 from serial.tools.list_ports_posix import comports
 
+# number of commands to send before reading responses
+BatchSize = 32
+
 iterator = comports()
 teensy_devices = []
 cursor_index = 0
@@ -32,11 +34,14 @@ if len(teensy_devices) == 1:
         print(f'Sorry, not a DigitalVFO device, ID={answer}')
         sys.exit(1)
 
-    for freq in range(1000000, 30000000+1, 1000):
-        cmd = f'FS{freq};'.encode('latin-1')
+    # send frequency commands in batches, then read all the responses
+    freqs = range(1000000, 30000000+1, 1000)
+    for i in range(0, len(freqs), BatchSize):
+        batch = freqs[i:i+BatchSize]
+        cmd = b''.join(f'FS{freq};'.encode('latin-1') for freq in batch)
         ser.write(cmd)                 # set device frequency
-        answer = ser.readline()
-        time.sleep(0.10)
+        for _ in batch:
+            answer = ser.read_until(b'\n')
 
     ser.close()
 elif len(teensy_devices) == 0:
@@ -1,62 +1,99 @@
 """
 Plot the charge.dat data.
+
+Each panel is rendered to its own image in a worker process and the
+images are then stacked into the final plot.
 """
 
-#import matplotlib as mpl
+import io
+import multiprocessing
+
+import matplotlib as mpl
+mpl.use('Agg')
+import matplotlib.image as mpimg
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 
 DataFile = 'charge.dat'
+PlotFile = 'charge.png'
+
+# every panel is rendered with the same size and margins so the time axes line up
+PanelSize = (8, 2)          # inches
+PanelDPI = 100
+PanelMargins = {'left': 0.1, 'right': 0.97, 'top': 0.85, 'bottom': 0.25}
+
+# time between samples (hours)
+SampleInterval = 0.25
+
+# plot at most this many points per panel, else downsample into NumBins bins
+MaxPoints = 4000
+NumBins = 2000
+
+def plot_data(ax, t, y, label):
+    """Plot 'y' against 't' on 'ax', downsampling if there is a lot of data.
+
+    Downsampled data is drawn as the mean of each bin inside a band
+    showing the min/max of the bin.
+    """
+
+    if len(y) <= MaxPoints:
+        ax.plot(t, y, label=label)
+        return
+
+    # split into at most NumBins nearly equal bins, keeping every sample
+    edges = np.linspace(0, len(y), NumBins + 1).astype(int)[:-1]
+    counts = np.diff(np.append(edges, len(y)))
+    t = np.add.reduceat(np.asarray(t, dtype=float), edges) / counts
+    y = np.asarray(y, dtype=float)
+    ax.fill_between(t, np.minimum.reduceat(y, edges), np.maximum.reduceat(y, edges),
+                    alpha=0.3)
+    ax.plot(t, np.add.reduceat(y, edges) / counts, label=label)
 
-# read in raw data
-t_data = []
-psv_data = []
-psi_data = []
-volts_data = []
-percent_data = []
-time = 0
-with open(DataFile, 'r') as f:
+def render_panel(t, y, label, ylabel, title=None, xlabel=None):
+    """Render one panel.
+
+    Returns the panel image as PNG data.
+    """
+
+    fig, ax = plt.subplots(figsize=PanelSize, dpi=PanelDPI)
+    fig.subplots_adjust(**PanelMargins)
+    plot_data(ax, t, y, label)
+    if title:
+        ax.set_title(title)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(True)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=PanelDPI)
+    plt.close(fig)
+    return buf.getvalue()
+
+def main():
+    # read in raw data
     # date       hour PSv  PSi v    %
     # 2018-07-13,1745,8.39,344,7.82,101
-    for line in f:
-        (date, hour, psv, psi, volts, percent) = line.strip().split(',')
-        psv = float(psv)
-        psi = int(psi)
-        volts = float(volts)
-        percent = int(percent)
-        t_data.append(time)
-        time += 0.25
-        psv_data.append(psv)
-        psi_data.append(psi)
-        volts_data.append(volts)
-        percent_data.append(percent)
-
-# plot data
-fig, ax = plt.subplots()
-plt.subplot(4, 1, 1)
-plt.plot(t_data, psv_data, label='PSv')
-plt.title('2S 18650 Charge')
-plt.ylabel('PSv (V)')
-
-plt.subplot(4, 1, 2)
-plt.plot(t_data, psi_data, label='PSi')
-#plt.title('2S 18650 Charge')
-plt.ylabel('PSi (mA)')
-
-plt.subplot(4, 1, 3)
-plt.plot(t_data, volts_data, label='volts')
-#plt.title('2S 18650 Charge')
-plt.ylabel('volts')
-
-plt.subplot(4, 1, 4)
-plt.plot(t_data, percent_data, label='percent charge')
-#plt.title('2S 18650 Charge')
-plt.ylabel('charge %')
-plt.xlabel('time (hours)')
-ax.grid(True)
-
-
-#plt.xlabel('time (hours)')
-#plt.ylabel('percent charge')
-#ax.legend(loc='top left')
-
-plt.show()
+    df = pd.read_csv(DataFile, header=None,
+                     names=['date', 'hour', 'psv', 'psi', 'volts', 'percent'])
+    t_data = np.arange(len(df), dtype=np.float32) * SampleInterval
+
+    panels = [(t_data, df['psv'].values, 'PSv', 'PSv (V)', '2S 18650 Charge'),
+              (t_data, df['psi'].values, 'PSi', 'PSi (mA)'),
+              (t_data, df['volts'].values, 'volts', 'volts'),
+              (t_data, df['percent'].values, 'percent charge', 'charge %',
+               None, 'time (hours)')]
+
+    # render the panels in parallel; note that for typical logs starting the
+    # workers and pickling the data to them costs more than the rendering saves,
+    # any speedup only appears (if at all) for very long captures
+    with multiprocessing.Pool(len(panels)) as pool:
+        images = pool.starmap(render_panel, panels)
+
+    # panels are all the same width, so just stack them into one image
+    image = np.vstack([mpimg.imread(io.BytesIO(png)) for png in images])
+    plt.imsave(PlotFile, image)
+
+if __name__ == '__main__':
+    main()
@@ -7,26 +7,15 @@ Data file has lines:
 
 #import matplotlib as mpl
 import matplotlib.pyplot as plt
-from datetime import datetime
+import pandas as pd
 
 DataFile = 'charge.out'
 
 # read in raw data
-x_data = []
-y_data = []
-starttime = 0
-time = 0
-with open(DataFile, 'r') as f:
-    for line in f:
-        (dt, volts) = line.strip().split(',')
-        volts = float(volts)
-        dt = datetime.strptime(dt, '%Y-%m-%dT%H:%M:%S.%f')
-        if starttime == 0:
-            starttime = dt
-        delta = dt - starttime
-        time = delta.total_seconds() / (60 * 60)
-        x_data.append(time)
-        y_data.append(volts)
+df = pd.read_csv(DataFile, header=None, names=['dt', 'volts'])
+df['dt'] = pd.to_datetime(df['dt'], format='ISO8601')
+x_data = (df['dt'] - df['dt'].iloc[0]).dt.total_seconds() / (60 * 60)
+y_data = df['volts']
 
 # plot data
 
@@ -6,9 +6,9 @@ A small library to allow a python program control the DigitalVFO.
 
 import os
 import sys
-import time
+import asyncio
 import datetime
-import serial
+import serial_asyncio
 
 
 # chose a comports() implementation, depending on os
@@ -28,6 +28,15 @@ ProductID = 0x0483
 #VendorID = 0x1a86
 #ProductID = 0x7523
 
+# seconds between readings
+SampleInterval = 30
+
+# seconds to wait for a reply before giving up on a reading
+ReadTimeout = 5
+
+# seconds to wait for more data when discarding stale input
+DiscardTimeout = 0.01
+
 
 ######
 # Code to find all Teensy devices that can communicate
@@ -46,46 +55,78 @@ def find_teensy():
     return result
 
 
+# cached result of comports(), enumeration can take seconds on Windows
+_ports_cache = None
+
+def invalidate_ports_cache():
+    """Forget the cached ports, use after a device is plugged/unplugged."""
+
+    global _ports_cache
+    _ports_cache = None
+
 def find_teensy():
     """Returns a list of ports for all Teensy devices."""
 
-    result = []
-    for usb_dev in sorted(comports()):
-        if usb_dev.vid == VendorID and usb_dev.pid == ProductID:
-            result.append(usb_dev)
+    global _ports_cache
+    if _ports_cache is None:
+        _ports_cache = comports()
+
+    result = [p for p in _ports_cache if p.vid == VendorID and p.pid == ProductID]
+    result.sort(key=lambda p: p.device)
     return result
 
-def _readline(ser):
-    eol = b'\n'
-    line = bytearray()
+async def _discard_input(reader):
+    """Throw away any data already received on 'reader'.
+
+    A reply that arrives after its read timed out would otherwise be
+    taken as the answer to the next poll.
+    """
+
     while True:
-        c = ser.read(1)
-        if c:
-            if c == eol:
-                break
-            line += c
-    return str(bytes(line), encoding='utf-8')
-
-def main(out_file):
-    devices = find_teensy()
+        try:
+            data = await asyncio.wait_for(reader.read(1024), timeout=DiscardTimeout)
+        except asyncio.TimeoutError:
+            return
+        if not data:
+            return
+
+async def main(out_file):
+    devices = list(find_teensy())
+    num_devices = len(devices)
     
-    print(f"{len(list(devices))} teensy device{'s' if len(devices) != 1 else ''} found")
+    print(f"{num_devices} teensy device{'s' if num_devices != 1 else ''} found")
     for x in devices:
         print(f'    {x.device}')
     
     print('\nReading...')
     if len(devices) == 1:
-        f =  open(out_file, 'w')
-        with serial.Serial(port=devices[0].device, baudrate=115200) as ser:
-            while True:
-                ser.write(b'VG;')
-                line = _readline(ser)
-                now = datetime.datetime.now()
-                dt = now.isoformat()
-                data = f'{dt},{line[:-1]}'
-                f.write(data + '\n')
-                f.flush()
-                time.sleep(30)
+        loop = asyncio.get_running_loop()
+        with open(out_file, 'w', buffering=1) as f:
+            (reader, writer) = await serial_asyncio.open_serial_connection(url=devices[0].device,
+                                                                           baudrate=115200)
+            try:
+                next_t = loop.time() + SampleInterval
+                while True:
+                    await _discard_input(reader)
+                    writer.write(b'VG;')
+                    await writer.drain()
+                    try:
+                        line = await asyncio.wait_for(reader.readuntil(b'\n'),
+                                                      timeout=ReadTimeout)
+                    except asyncio.TimeoutError:
+                        print(f'{datetime.datetime.now().isoformat()}: no response, skipping')
+                    else:
+                        line = str(line[:-1], encoding='utf-8')
+                        now = datetime.datetime.now()
+                        dt = now.isoformat()
+                        data = f'{dt},{line[:-1]}'
+                        await loop.run_in_executor(None, f.write, data + '\n')
+                    sleep_for = next_t - loop.time()
+                    next_t += SampleInterval
+                    await asyncio.sleep(max(0, sleep_for))
+            finally:
+                writer.close()
+                await writer.wait_closed()
 
 if sys.argv[0] == __file__:
     if len(sys.argv) != 2:
@@ -98,4 +139,4 @@ else:
         sys.exit(2)
     filename = sys.argv[1]
 
-main(filename)
+asyncio.run(main(filename))
@@ -21,6 +21,12 @@ elif os.name == 'posix':
 else:
     raise ImportError(f"Sorry: no implementation for your platform ('{os.name}') available")
 
+# needed to set the driver's low latency flag, Linux only
+if sys.platform.startswith('linux'):
+    import fcntl
+    import struct
+    import termios
+
 # dump from USB/FTDI board
 #DEVICE ID 0403:6001 on Bus 020 Address 018 =================
 # bLength                :   0x12 (18 bytes)
@@ -43,41 +49,81 @@ else:
 VendorID = 0x0403
 ProductID = 0x6001
 
+# Linux serial_struct values, used to set the driver's low latency flag
+ASYNC_LOW_LATENCY = 0x2000
+SerialStructSize = 0x60         # bigger than any sizeof(struct serial_struct)
+SerialFlagsFormat = 'iiIii'     # type, line, port, irq, flags
+
 
 def find_device():
     """Returns a list of ports for all appropriate devices."""
 
-    result = []
-    for usb_dev in sorted(comports()):
-        if usb_dev.vid == VendorID and usb_dev.pid == ProductID:
-            result.append(usb_dev)
+    result = [p for p in comports() if p.vid == VendorID and p.pid == ProductID]
+    result.sort(key=lambda p: p.device)
     return result
 
+# received data not yet returned by _readline()
+_rx_buf = bytearray()
+
 def _readline(ser):
     """Read a line from device on 'ser'.
 
     ser  open serial port
 
     Returns all characters up to, but not including, a newline character.
+    Any data received after the newline is kept for the next call.
+    Raises TimeoutError if the read times out before any data is received.
     """
 
-    line = bytearray()      # collect data in a byte array
+    # read whatever is waiting (at least 1 byte) until we have a newline
+    while b'\n' not in _rx_buf:
+        data = ser.read(ser.in_waiting or 1)
+        if not data and not _rx_buf:
+            raise TimeoutError(f'No response from {ser.port}')
+        _rx_buf.extend(data)
 
-    while True:
-        c = ser.read(1)
-        if c:
-            if c == b'\n':
-                break
-            line += c
+    idx = _rx_buf.index(b'\n')
+    line = bytes(_rx_buf[:idx])
+    del _rx_buf[:idx+1]
 
     return str(line, encoding='utf-8')
 
+def set_low_latency(ser):
+    """Make the FTDI driver for 'ser' deliver received data quickly.
+
+    ser  open serial port
+
+    Sets the FTDI latency timer to 1ms (the default of 16ms delays every
+    short response) and sets the ASYNC_LOW_LATENCY flag on the port.
+    Only possible on Linux, and quietly does nothing if we can't do it.
+    """
+
+    if not sys.platform.startswith('linux'):
+        return
+
+    name = os.path.basename(ser.port)
+    try:
+        with open(f'/sys/bus/usb-serial/devices/{name}/latency_timer', 'w') as f:
+            f.write('1')
+    except OSError:
+        pass
+
+    try:
+        buf = bytearray(fcntl.ioctl(ser.fileno(), termios.TIOCGSERIAL, bytes(SerialStructSize)))
+        fields = list(struct.unpack_from(SerialFlagsFormat, buf))
+        fields[4] |= ASYNC_LOW_LATENCY
+        struct.pack_into(SerialFlagsFormat, buf, 0, *fields)
+        fcntl.ioctl(ser.fileno(), termios.TIOCSSERIAL, bytes(buf))
+    except OSError:
+        pass
+
 def main():
     # get all appropriate device(s)
-    devices = find_device()
+    devices = list(find_device())
+    num_devices = len(devices)
    
     # display the appropriate device(s) - DEBUG
-    print(f"{len(list(devices))} device{'s' if len(devices) != 1 else ''} found")
+    print(f"{num_devices} device{'s' if num_devices != 1 else ''} found")
     for x in devices:
         print(f'    {x.device}')
    
@@ -85,11 +131,18 @@ def main():
     if len(devices) == 1:
         port = devices[0].device
         print(f'\nTesting on device {port}\n')
-        ser = serial.Serial(port=port, baudrate=115200, timeout=0.5)
+        ser = serial.Serial(port=port, baudrate=115200, timeout=0.05,
+                            inter_byte_timeout=0.002, write_timeout=0.5)
+        set_low_latency(ser)
 
         cmd_num = 0
         try:
             while True:
+                # drop any late reply to an earlier command so it isn't
+                # taken as the answer to this one
+                ser.reset_input_buffer()
+                _rx_buf.clear()
+
                 # send a command to Arduino
                 cmd = f'CMD{cmd_num};'
                 print(f'Send: {cmd}')
@@ -97,17 +150,24 @@ def main():
                 cmd_num += 1
 
                 # read the response from the Arduino
-                line = _readline(ser)
-                line = line.strip()
-                now = datetime.datetime.now()
-                dt = now.isoformat()
-                print(f"{dt}: received '{line}'")
+                try:
+                    line = _readline(ser)
+                    line = line.strip()
+                    now = datetime.datetime.now()
+                    dt = now.isoformat()
+                    print(f"{dt}: received '{line}'")
+                except TimeoutError as e:
+                    print(e)
                 time.sleep(1)
         except KeyboardInterrupt:
 #            cmd = 'QUIT;'
 #            print(f"\nSend: '{cmd}'")
 #            ser.write(bytes(cmd, encoding='utf-8'))
 #            time.sleep(0.5)
+            pass
+        except serial.SerialTimeoutException:
+            print(f'Write to {port} timed out, quitting.')
+        finally:
             ser.close()
             print(f'Serial port {port} closed.')
     elif len(devices) > 1: